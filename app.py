@@ -1,123 +1,277 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from geopy.distance import geodesic
-import plotly.graph_objects as go
-import plotly.express as px
-import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+import json
 import math
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+
+# --- Route Geometry ---
+def to_unit_vectors(lat_rad, lon_rad):
+    """Convert latitudes/longitudes in radians to unit vectors on the sphere"""
+    cos_lat = np.cos(lat_rad)
+    return np.stack(
+        [cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)],
+        axis=-1,
+    )
+
+
+EARTH_RADIUS_KM = 6371.0088  # IUGG mean Earth radius
+
+
+def geodesic_km(a, b):
+    """Great-circle distance in km between two (lat, lon) points"""
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def unit_vector(lat_rad, lon_rad):
+    """Scalar counterpart of to_unit_vectors, using math instead of ufuncs"""
+    cos_lat = math.cos(lat_rad)
+    return np.array(
+        [cos_lat * math.cos(lon_rad), cos_lat * math.sin(lon_rad), math.sin(lat_rad)]
+    )
+
+
+def sample_great_circle(dep_coord, arr_coord, num_points=21):
+    """Sample points along the great circle route as unit vectors"""
+    ratios = np.linspace(0, 1, num_points)
+    dep_lat, dep_lon = math.radians(dep_coord[0]), math.radians(dep_coord[1])
+    arr_lat, arr_lon = math.radians(arr_coord[0]), math.radians(arr_coord[1])
+
+    p0 = unit_vector(dep_lat, dep_lon)
+    p1 = unit_vector(arr_lat, arr_lon)
+    omega = geodesic_km(dep_coord, arr_coord) / EARTH_RADIUS_KM  # Central angle
+    sin_omega = math.sin(omega)
+
+    if sin_omega < 1e-9:
+        # Same (or antipodal) endpoints: fall back to linear interpolation
+        lats = dep_lat + ratios * (arr_lat - dep_lat)
+        lons = dep_lon + ratios * (arr_lon - dep_lon)
+        return to_unit_vectors(lats, lons)
+
+    # Spherical linear interpolation (slerp)
+    w0 = np.sin((1 - ratios) * omega) / sin_omega
+    w1 = np.sin(ratios * omega) / sin_omega
+    return w0[:, None] * p0 + w1[:, None] * p1
+
+
+def calculate_etops_requirement(dep_coord, arr_coord, airport_index):
+    """Calculate the ETOPS requirement for a route"""
+    points = sample_great_circle(dep_coord, arr_coord)  # 21 points incl. ends
+
+    # Nearest airport to each sample point = largest dot product of unit vectors
+    nearest_cos = (points.astype(np.float32) @ airport_index["xyz"].T).max(axis=1)
+
+    # Largest distance to the nearest airport along the route
+    worst_cos = float(nearest_cos.min())
+    return EARTH_RADIUS_KM * math.acos(max(-1.0, min(1.0, worst_cos)))
+
+
+def build_etops_requirement_table(airport_index):
+    """ETOPS requirement (km) for every airport pair
+
+    Entry [i, j] is the route from airport i to airport j in airport_index
+    order.
+    """
+    coords = list(zip(airport_index["lat"], airport_index["lon"]))
+    table = np.zeros((len(coords), len(coords)))
+    for i, dep_coord in enumerate(coords):
+        for j, arr_coord in enumerate(coords):
+            if i != j:
+                table[i, j] = calculate_etops_requirement(
+                    dep_coord, arr_coord, airport_index
+                )
+    return table
 
 
 # --- Load Data ---
 @st.cache_data
-def load_data():
+def load_tables():
     aircraft_df = pd.read_csv("data/aircraft.csv")
-    airports_df = pd.read_csv("data/airports.csv").set_index("IATA")
+    # Region and Hub_Type are not used by the game; skip them at parse time
+    airports_df = pd.read_csv(
+        "data/airports.csv",
+        usecols=["IATA", "Name", "Latitude", "Longitude"],
+        index_col="IATA",
+    )
     return aircraft_df, airports_df
 
 
-aircraft_df, airports_df = load_data()
+@st.cache_resource
+def build_airport_index(airports_df):
+    """Column-wise airport arrays for fast positional access and vectorized math
+
+    Cached as a shared resource so reruns reuse the same arrays instead of
+    unpickling a fresh copy each time. Treat the result as read-only.
+    """
+    lat = airports_df["Latitude"].to_numpy(dtype=np.float64)
+    lon = airports_df["Longitude"].to_numpy(dtype=np.float64)
+    airport_index = {
+        "iata": airports_df.index.to_numpy(),
+        "name": airports_df["Name"].to_numpy(),
+        "lat": lat,
+        "lon": lon,
+        # (N, 3) unit vectors for nearest-airport queries. float32 halves the
+        # data moved and changes ETOPS distances by less than 0.1 km
+        "xyz": to_unit_vectors(np.radians(lat), np.radians(lon)).astype(np.float32),
+        "iata_to_idx": {code: i for i, code in enumerate(airports_df.index)},
+        # Selectbox display labels
+        "label": {
+            iata: f"{iata} - {name}" for iata, name in airports_df["Name"].items()
+        },
+    }
+    # Pairwise ETOPS requirements, built from the same arrays so the table
+    # always lines up with iata_to_idx
+    airport_index["etops_required_km"] = build_etops_requirement_table(airport_index)
+    return airport_index
+
+
+@st.cache_resource
+def build_aircraft_index(aircraft_df):
+    """Aircraft lookups and display tables shared across reruns (read-only)"""
+    return {
+        "model_to_idx": {model: i for i, model in enumerate(aircraft_df["Model"])},
+        "category": aircraft_df["Category"].to_numpy(),
+        "category_display": aircraft_df[
+            ["Model", "ETOPS", "Capacity", "Range", "SDG_Score"]
+        ],
+    }
+
+
+aircraft_df, airports_df = load_tables()
+airport_index = build_airport_index(airports_df)
+aircraft_index = build_aircraft_index(aircraft_df)
 
 
 # --- Scoring and Title System ---
-def calculate_game_score(
+# Tier boundaries for the environmental (CO2 kg per passenger, lower is better)
+# and efficiency (capacity utilization %, higher is better) scores
+CO2_SCORE_THRESHOLDS = np.array([50, 100, 150, 200])
+CO2_SCORE_POINTS = np.array([25, 20, 15, 10, 5])
+UTILIZATION_SCORE_THRESHOLDS = np.array([60, 70, 80, 90])
+UTILIZATION_SCORE_POINTS = np.array([5, 10, 15, 20, 25])
+
+
+def calculate_game_score_batch(
     etops_compliant, co2_per_passenger, capacity_utilization, aircraft_sdg_score
 ):
     """
-    Calculate comprehensive game score (0-100 points)
+    Calculate game scores for many routes at once (array inputs, array outputs)
     """
     # ETOPS Compliance Score (0-25 points)
-    etops_score = 25 if etops_compliant else 0
+    etops_score = np.where(etops_compliant, 25, 0)
 
     # Environmental Score (0-25 points) - Lower CO2 per passenger is better
-    if co2_per_passenger <= 50:
-        env_score = 25
-    elif co2_per_passenger <= 100:
-        env_score = 20
-    elif co2_per_passenger <= 150:
-        env_score = 15
-    elif co2_per_passenger <= 200:
-        env_score = 10
-    else:
-        env_score = 5
+    env_score = CO2_SCORE_POINTS[
+        np.searchsorted(CO2_SCORE_THRESHOLDS, co2_per_passenger, side="left")
+    ]
 
     # Efficiency Score (0-25 points) - Based on capacity utilization
-    if capacity_utilization >= 90:
-        eff_score = 25
-    elif capacity_utilization >= 80:
-        eff_score = 20
-    elif capacity_utilization >= 70:
-        eff_score = 15
-    elif capacity_utilization >= 60:
-        eff_score = 10
-    else:
-        eff_score = 5
+    eff_score = UTILIZATION_SCORE_POINTS[
+        np.searchsorted(
+            UTILIZATION_SCORE_THRESHOLDS, capacity_utilization, side="right"
+        )
+    ]
 
     # Aircraft Performance Score (0-25 points) - Based on SDG score
-    aircraft_score = (aircraft_sdg_score / 10) * 25
+    aircraft_score = (np.asarray(aircraft_sdg_score) / 10) * 25
 
     total_score = etops_score + env_score + eff_score + aircraft_score
 
     return {
-        "total_score": round(total_score),
+        "total_score": np.round(total_score).astype(int),
+        "etops_score": etops_score,
+        "environmental_score": env_score,
+        "efficiency_score": eff_score,
+        "aircraft_score": np.round(aircraft_score).astype(int),
+    }
+
+
+def calculate_game_score(
+    etops_compliant, co2_per_passenger, capacity_utilization, aircraft_sdg_score
+):
+    """
+    Calculate comprehensive game score (0-100 points)
+    """
+    scores = calculate_game_score_batch(
+        etops_compliant, co2_per_passenger, capacity_utilization, aircraft_sdg_score
+    )
+    etops_score = int(scores["etops_score"])
+    env_score = int(scores["environmental_score"])
+    eff_score = int(scores["efficiency_score"])
+    aircraft_score = int(scores["aircraft_score"])
+
+    return {
+        "total_score": int(scores["total_score"]),
         "etops_score": etops_score,
         "environmental_score": env_score,
         "efficiency_score": eff_score,
-        "aircraft_score": round(aircraft_score),
+        "aircraft_score": aircraft_score,
         "breakdown": {
             "ETOPS適合性": f"{etops_score}/25",
             "環境性能": f"{env_score}/25",
             "運航効率": f"{eff_score}/25",
-            "機材性能": f"{round(aircraft_score)}/25",
+            "機材性能": f"{aircraft_score}/25",
         },
     }
 
 
+# Title tiers in ascending score order; tier i applies from
+# TITLE_THRESHOLDS[i - 1] up to (not including) TITLE_THRESHOLDS[i]
+TITLE_THRESHOLDS = (60, 70, 80, 90)
+TITLE_TIERS = (
+    {
+        "title": "🔧 要改善",
+        "badge": "⚠️",
+        "color": "error",
+        "message": "運航計画の見直しが必要です。機材選択から再検討してみてください。",
+        "tier": "見習い",
+    },
+    {
+        "title": "📚 研修生",
+        "badge": "🥉",
+        "color": "warning",
+        "message": "基本はできています。ETOPS適合性と環境性能の向上を目指しましょう。",
+        "tier": "初級者",
+    },
+    {
+        "title": "🌱 駆け出し経営者",
+        "badge": "🥈",
+        "color": "warning",
+        "message": "良いスタートです！さらなる改善で上位ランクを目指しましょう。",
+        "tier": "中級者",
+    },
+    {
+        "title": "✈️ 優秀な経営者",
+        "badge": "🥇",
+        "color": "success",
+        "message": "優秀な運航計画です！環境と効率のバランスが取れています。",
+        "tier": "エキスパート",
+    },
+    {
+        "title": "🏆 エコ航空の達人",
+        "badge": "🌟",
+        "color": "success",
+        "message": "素晴らしい！持続可能な航空運航のエキスパートです！",
+        "tier": "レジェンド",
+    },
+)
+
+
 def get_title_and_badge(score):
     """
-    Determine title and badge based on score
+    Determine title and badge based on score (shared dict, treat as read-only)
     """
-    if score >= 90:
-        return {
-            "title": "🏆 エコ航空の達人",
-            "badge": "🌟",
-            "color": "success",
-            "message": "素晴らしい！持続可能な航空運航のエキスパートです！",
-            "tier": "レジェンド",
-        }
-    elif score >= 80:
-        return {
-            "title": "✈️ 優秀な経営者",
-            "badge": "🥇",
-            "color": "success",
-            "message": "優秀な運航計画です！環境と効率のバランスが取れています。",
-            "tier": "エキスパート",
-        }
-    elif score >= 70:
-        return {
-            "title": "🌱 駆け出し経営者",
-            "badge": "🥈",
-            "color": "warning",
-            "message": "良いスタートです！さらなる改善で上位ランクを目指しましょう。",
-            "tier": "中級者",
-        }
-    elif score >= 60:
-        return {
-            "title": "📚 研修生",
-            "badge": "🥉",
-            "color": "warning",
-            "message": "基本はできています。ETOPS適合性と環境性能の向上を目指しましょう。",
-            "tier": "初級者",
-        }
-    else:
-        return {
-            "title": "🔧 要改善",
-            "badge": "⚠️",
-            "color": "error",
-            "message": "運航計画の見直しが必要です。機材選択から再検討してみてください。",
-            "tier": "見習い",
-        }
+    return TITLE_TIERS[bisect_right(TITLE_THRESHOLDS, score)]
 
 
 def display_score_dashboard(score_data, title_data):
@@ -144,8 +298,12 @@ def display_score_dashboard(score_data, title_data):
 
     # Score breakdown
     st.sidebar.subheader("📊 スコア内訳")
-    for category, points in score_data["breakdown"].items():
-        st.sidebar.text(f"{category}: {points}")
+    st.sidebar.text(
+        "\n".join(
+            f"{category}: {points}"
+            for category, points in score_data["breakdown"].items()
+        )
+    )
 
     # Achievement message
     if title_data["color"] == "success":
@@ -181,66 +339,216 @@ def display_achievement_banner(title_data, score):
 
 
 # --- Helper Functions (existing) ---
-def calculate_etops_requirement(dep_coord, arr_coord, airports_df):
-    """Calculate the ETOPS requirement for a route"""
-    max_distance_to_nearest_airport = 0
-
-    # Sample points along the great circle route
-    for i in range(21):  # 21 points including start and end
-        ratio = i / 20
-        # Simple linear interpolation for demonstration
-        lat = dep_coord[0] + ratio * (arr_coord[0] - dep_coord[0])
-        lon = dep_coord[1] + ratio * (arr_coord[1] - dep_coord[1])
-
-        # Find distance to nearest airport
-        min_distance = float("inf")
-        for _, airport in airports_df.iterrows():
-            distance = geodesic(
-                (lat, lon), (airport["Latitude"], airport["Longitude"])
-            ).km
-            min_distance = min(min_distance, distance)
-
-        max_distance_to_nearest_airport = max(
-            max_distance_to_nearest_airport, min_distance
-        )
+def get_airport_coord(iata):
+    """(lat, lon) of an airport, read from the precomputed coordinate arrays"""
+    idx = airport_index["iata_to_idx"][iata]
+    return (airport_index["lat"][idx], airport_index["lon"][idx])
+
 
-    return max_distance_to_nearest_airport
+def get_airport_name(iata):
+    """Airport name, read from the precomputed name array"""
+    return airport_index["name"][airport_index["iata_to_idx"][iata]]
 
 
-def calculate_sdg_impact(aircraft, distance_km, passengers):
-    """Calculate SDG impact metrics"""
-    total_fuel = distance_km * aircraft["Fuel_L_per_km"]
-    total_co2 = distance_km * aircraft["CO2_kg_per_km"]
+def get_etops_required_km(dep_iata, arr_iata):
+    """ETOPS requirement (km) for a route, read from the precomputed table"""
+    iata_to_idx = airport_index["iata_to_idx"]
+    return float(
+        airport_index["etops_required_km"][iata_to_idx[dep_iata], iata_to_idx[arr_iata]]
+    )
+
+
+class SDGMetrics(NamedTuple):
+    """SDG impact metrics for one aircraft on one route"""
+
+    total_fuel: float
+    total_co2: float
+    co2_per_passenger: float
+    efficiency_score: float
+    utilization_score: float
+    total_sdg_score: float
+
+
+def calculate_sdg_impact(
+    fuel_l_per_km,
+    co2_kg_per_km,
+    sdg_score,
+    distance_km,
+    passengers,
+    capacity_utilization,
+):
+    """Calculate SDG impact metrics for one aircraft from its plain figures
+
+    capacity_utilization is the seat load factor in percent, the same value
+    the game score uses.
+    """
+    total_fuel = distance_km * fuel_l_per_km
+    total_co2 = distance_km * co2_kg_per_km
     co2_per_passenger = total_co2 / passengers if passengers > 0 else total_co2
 
     # SDG scoring (higher is better)
-    efficiency_score = max(0, 10 - (co2_per_passenger / 100))
-    capacity_utilization = passengers / aircraft["Capacity"]
-    utilization_score = capacity_utilization * 10
+    efficiency_score = max(0.0, 10 - (co2_per_passenger / 100))
+    utilization_score = capacity_utilization / 10
+
+    total_sdg_score = (efficiency_score + utilization_score + sdg_score) / 3
+
+    return SDGMetrics(
+        total_fuel=total_fuel,
+        total_co2=total_co2,
+        co2_per_passenger=co2_per_passenger,
+        efficiency_score=efficiency_score,
+        utilization_score=utilization_score,
+        total_sdg_score=total_sdg_score,
+    )
 
-    total_sdg_score = (efficiency_score + utilization_score + aircraft["SDG_Score"]) / 3
 
-    return {
-        "total_fuel": total_fuel,
-        "total_co2": total_co2,
-        "co2_per_passenger": co2_per_passenger,
-        "efficiency_score": efficiency_score,
-        "utilization_score": utilization_score,
-        "total_sdg_score": total_sdg_score,
-    }
+class RouteAnalysis(NamedTuple):
+    """Route metrics, SDG impact and game score for one aircraft on one route"""
+
+    route_distance: float
+    etops_required_min: float
+    etops_compliant: bool
+    capacity_utilization: float
+    sdg_metrics: SDGMetrics
+    score_data: dict
+    title_data: dict
+
+
+@st.cache_data(max_entries=4096, show_spinner=False)
+def analyze_route(model, departure, arrival, passengers):
+    """
+    Run the full route analysis, cached so reruns that only change unrelated
+    widgets (map type, expanders, ...) skip straight to rendering
+    """
+    aircraft = aircraft_df.iloc[aircraft_index["model_to_idx"][model]]
+
+    # Calculate route metrics
+    route_distance = geodesic_km(
+        get_airport_coord(departure), get_airport_coord(arrival)
+    )
+    etops_required_km = get_etops_required_km(departure, arrival)
+    etops_required_min = (etops_required_km / aircraft["Speed"]) * 60
+
+    # Seat load factor (%): an aircraft can carry at most its seat count.
+    # Shared by the SDG metrics and the game score
+    capacity = int(aircraft["Capacity"])
+    capacity_utilization = min(passengers, capacity) / capacity * 100
+
+    # SDG Impact Analysis
+    sdg_metrics = calculate_sdg_impact(
+        float(aircraft["Fuel_L_per_km"]),
+        float(aircraft["CO2_kg_per_km"]),
+        float(aircraft["SDG_Score"]),
+        route_distance,
+        passengers,
+        capacity_utilization,
+    )
+
+    # Calculate Game Score
+    etops_compliant = bool(etops_required_min <= aircraft["ETOPS"])
+
+    score_data = calculate_game_score(
+        etops_compliant,
+        sdg_metrics.co2_per_passenger,
+        capacity_utilization,
+        float(aircraft["SDG_Score"]),
+    )
+
+    return RouteAnalysis(
+        route_distance=float(route_distance),
+        etops_required_min=float(etops_required_min),
+        etops_compliant=etops_compliant,
+        capacity_utilization=capacity_utilization,
+        sdg_metrics=sdg_metrics,
+        score_data=score_data,
+        title_data=get_title_and_badge(score_data["total_score"]),
+    )
+
+
+# --- Map Backends ---
+# Only one map backend is used per session, so each is imported on first use
+@lru_cache(maxsize=None)
+def load_folium():
+    import folium
+
+    return folium
+
+
+@lru_cache(maxsize=None)
+def load_plotly_go():
+    import plotly.graph_objects as go
+
+    return go
+
+
+# Leaflet script for the airport layer, compiled by load_airport_layer_template
+AIRPORT_LAYER_SCRIPT = """
+    {% macro script(this, kwargs) %}
+    (function () {
+        // Shared style objects, and popup text built only when a popup opens
+        var rangeStyle = {
+            radius: {{ this.radius_m }},
+            color: "orange",
+            fillColor: "yellow",
+            fillOpacity: 0.2,
+            weight: 1
+        };
+        var markerStyle = {
+            radius: 5,
+            color: "black",
+            fillColor: "white",
+            fillOpacity: 0.8
+        };
+        {{ this.points }}.forEach(function (p) {
+            L.circle([p[0], p[1]], rangeStyle)
+                .bindPopup(function () {
+                    return "ETOPS範囲: " + p[2] + "<br>半径: {{ this.radius_label }}";
+                })
+                .addTo({{ this._parent.get_name() }});
+            L.circleMarker([p[0], p[1]], markerStyle)
+                .bindPopup(function () {
+                    return "✈️ " + p[2] + ": " + p[3];
+                })
+                .addTo({{ this._parent.get_name() }});
+        });
+    })();
+    {% endmacro %}
+    """
+
+
+@lru_cache(maxsize=None)
+def load_airport_layer_template():
+    # jinja2 ships with folium, so it is only loaded with the folium map
+    from jinja2 import Template
+
+    return Template(AIRPORT_LAYER_SCRIPT)
 
 
 def create_etops_map(
-    dep_coord, arr_coord, dep_name, arr_name, aircraft_etops, etops_required_min
+    dep_coord,
+    arr_coord,
+    dep_name,
+    arr_name,
+    aircraft_etops,
+    etops_required_min,
+    etops_compliant,
+    airport_index,
 ):
     """Create a folium map with ETOPS visualization"""
+    folium = load_folium()
+
     # Calculate center point for map
     center_lat = (dep_coord[0] + arr_coord[0]) / 2
     center_lon = (dep_coord[1] + arr_coord[1]) / 2
 
     # Create base map
+    # Canvas renderer: the per-airport circles and markers are drawn on one
+    # <canvas> instead of an SVG node each
     m = folium.Map(
-        location=[center_lat, center_lon], zoom_start=3, tiles="OpenStreetMap"
+        location=[center_lat, center_lon],
+        zoom_start=3,
+        tiles="OpenStreetMap",
+        prefer_canvas=True,
     )
 
     # Add departure airport
@@ -271,33 +579,29 @@ def create_etops_map(
     # Add ETOPS circles around available airports
     etops_radius_km = (aircraft_etops / 60) * 850  # Assuming average speed of 850 km/h
 
-    for iata, airport in airports_df.iterrows():
-        airport_coord = [airport["Latitude"], airport["Longitude"]]
-
-        # ETOPS circle
-        folium.Circle(
-            location=airport_coord,
-            radius=etops_radius_km * 1000,  # Convert to meters
-            popup=f"ETOPS範囲: {iata}<br>半径: {etops_radius_km:.0f}km",
-            color="orange",
-            fillColor="yellow",
-            fillOpacity=0.2,
-            weight=1,
-        ).add_to(m)
-
-        # Airport marker
-        folium.CircleMarker(
-            location=airport_coord,
-            radius=5,
-            popup=f"✈️ {iata}: {airport['Name']}",
-            color="black",
-            fillColor="white",
-            fillOpacity=0.8,
-        ).add_to(m)
+    # ETOPS ranges and airport markers are drawn client-side: the page only
+    # carries one airport array and a single loop creates the Leaflet layers
+    airport_layer = folium.MacroElement()
+    airport_layer._template = load_airport_layer_template()
+    airport_layer.points = json.dumps(
+        [
+            [round(float(lat), 4), round(float(lon), 4), iata, name]
+            for iata, name, lat, lon in zip(
+                airport_index["iata"],
+                airport_index["name"],
+                airport_index["lat"],
+                airport_index["lon"],
+            )
+        ],
+        ensure_ascii=False,
+    )
+    airport_layer.radius_m = round(etops_radius_km * 1000)  # Convert to meters
+    airport_layer.radius_label = f"{etops_radius_km:.0f}km"
+    m.add_child(airport_layer)
 
     # Add ETOPS status indicator
-    etops_status = "適合" if etops_required_min <= aircraft_etops else "不適合"
-    status_color = "green" if etops_required_min <= aircraft_etops else "red"
+    etops_status = "適合" if etops_compliant else "不適合"
+    status_color = "green" if etops_compliant else "red"
 
     # Add legend
     legend_html = f"""
@@ -317,8 +621,33 @@ def create_etops_map(
     return m
 
 
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_etops_map_html(
+    dep_iata, arr_iata, aircraft_etops, etops_required_min, etops_compliant
+):
+    """Render the ETOPS map to HTML, cached per route and aircraft ETOPS rating
+
+    etops_required_min is rounded for display only; the legend's status comes
+    from the caller's etops_compliant verdict on the unrounded minutes. The
+    HTML string is immutable, so it is shared across sessions as a resource
+    instead of being copied out of the data cache on every rerun.
+    """
+    etops_map = create_etops_map(
+        get_airport_coord(dep_iata),
+        get_airport_coord(arr_iata),
+        f"{dep_iata} ({get_airport_name(dep_iata)})",
+        f"{arr_iata} ({get_airport_name(arr_iata)})",
+        aircraft_etops,
+        etops_required_min,
+        etops_compliant,
+        airport_index,
+    )
+    return etops_map.get_root().render()
+
+
 def create_route_map_plotly(dep_coord, arr_coord, dep_name, arr_name):
     """Create a plotly map showing the route (fallback)"""
+    go = load_plotly_go()
     fig = go.Figure()
 
     # Add route line
@@ -348,15 +677,6 @@ def create_route_map_plotly(dep_coord, arr_coord, dep_name, arr_name):
     return fig
 
 
-# --- Session State Init ---
-if "game_mode" not in st.session_state:
-    st.session_state.game_mode = "route_planning"
-    st.session_state.selected_aircraft = None
-    st.session_state.departure = None
-    st.session_state.arrival = None
-    st.session_state.passengers = 200
-    st.session_state.map_type = "folium"
-
 # --- Page Config ---
 st.set_page_config(page_title="ETOPS Airline Strategy", page_icon="✈️", layout="wide")
 
@@ -420,26 +740,47 @@ with st.expander("🎮 ゲームの遊び方", expanded=False):
     """
     )
 
+# --- Selectbox Labels ---
+GAME_MODE_LABELS = {
+    "route_planning": "ルート計画モード",
+    "challenge_mode": "チャレンジモード",
+}
+MAP_TYPE_LABELS = {
+    "folium": "詳細地図 (Folium)",
+    "plotly": "シンプル地図 (Plotly)",
+}
+DIFFICULTY_LABELS = {
+    "easy": "😊 Easy",
+    "medium": "😐 Medium",
+    "hard": "😤 Hard",
+}
+CONSTRAINT_TYPE_LABELS = {
+    "budget": "💰 予算制限",
+    "category": "✈️ 機材カテゴリ制限",
+}
+CATEGORY_LABELS = {
+    "Regional": "🛩️ リージョナル機",
+    "Narrow-body": "✈️ ナローボディ機",
+    "Wide-body": "🛫 ワイドボディ機",
+    "Turboprop": "🚁 ターボプロップ機",
+}
+
 # --- Sidebar for Game Controls ---
 st.sidebar.header("🎮 Game Controls")
 game_mode = st.sidebar.selectbox(
     "モードを選択",
     ["route_planning", "challenge_mode"],
-    format_func=lambda x: (
-        "ルート計画モード" if x == "route_planning" else "チャレンジモード"
-    ),
+    format_func=GAME_MODE_LABELS.get,
+    key="game_mode",
 )
-st.session_state.game_mode = game_mode
 
 # Map type selection
 map_type = st.sidebar.selectbox(
     "地図表示タイプ",
     ["folium", "plotly"],
-    format_func=lambda x: (
-        "詳細地図 (Folium)" if x == "folium" else "シンプル地図 (Plotly)"
-    ),
+    format_func=MAP_TYPE_LABELS.get,
+    key="map_type",
 )
-st.session_state.map_type = map_type
 
 # Initialize variables
 departure = None
@@ -457,11 +798,7 @@ if game_mode == "challenge_10_routes":
         difficulty = st.selectbox(
             "難易度を選択",
             ["easy", "medium", "hard"],
-            format_func=lambda x: {
-                "easy": "😊 Easy",
-                "medium": "😐 Medium",
-                "hard": "😤 Hard",
-            }[x],
+            format_func=DIFFICULTY_LABELS.get,
         )
 
     with col2:
@@ -498,7 +835,7 @@ if game_mode == "challenge_10_routes":
             )
 
             # Aircraft selection for challenge
-            available_aircraft = aircraft_df.copy()
+            available_aircraft = aircraft_df
             selected_model = st.selectbox(
                 "機材を選択してください",
                 available_aircraft["Model"],
@@ -506,9 +843,7 @@ if game_mode == "challenge_10_routes":
                 help="チャレンジモード用機材選択",
             )
 
-            aircraft = available_aircraft[
-                available_aircraft["Model"] == selected_model
-            ].iloc[0]
+            aircraft = aircraft_df.iloc[aircraft_index["model_to_idx"][selected_model]]
 
             # Set route variables for analysis
             departure = current_route["departure"]
@@ -524,9 +859,7 @@ elif game_mode == "budget_constraint":
         constraint_type = st.selectbox(
             "制限タイプ",
             ["budget", "category"],
-            format_func=lambda x: (
-                "💰 予算制限" if x == "budget" else "✈️ 機材カテゴリ制限"
-            ),
+            format_func=CONSTRAINT_TYPE_LABELS.get,
         )
 
     if constraint_type == "budget":
@@ -552,7 +885,7 @@ elif game_mode == "budget_constraint":
                     "Price_Million_USD",
                     "SDG_Score",
                 ]
-            ].copy()
+            ]
             st.dataframe(display_df)
 
     else:  # category constraint
@@ -560,24 +893,15 @@ elif game_mode == "budget_constraint":
             allowed_category = st.selectbox(
                 "使用可能機材カテゴリ",
                 ["Regional", "Narrow-body", "Wide-body", "Turboprop"],
-                format_func=lambda x: {
-                    "Regional": "🛩️ リージョナル機",
-                    "Narrow-body": "✈️ ナローボディ機",
-                    "Wide-body": "🛫 ワイドボディ機",
-                    "Turboprop": "🚁 ターボプロップ機",
-                }[x],
+                format_func=CATEGORY_LABELS.get,
             )
 
-        available_aircraft = aircraft_df[
-            aircraft_df["Category"] == allowed_category
-        ].copy()
+        category_mask = aircraft_index["category"] == allowed_category
+        available_aircraft = aircraft_df[category_mask]
         st.info(f"{allowed_category}カテゴリ機材: {len(available_aircraft)}機種")
 
         # Display available aircraft
-        display_df = available_aircraft[
-            ["Model", "ETOPS", "Capacity", "Range", "SDG_Score"]
-        ].copy()
-        st.dataframe(display_df)
+        st.dataframe(aircraft_index["category_display"][category_mask])
 
     # If aircraft available, proceed with route planning
     if len(available_aircraft) > 0:
@@ -590,9 +914,7 @@ elif game_mode == "budget_constraint":
                 available_aircraft["Model"],
                 help="制限モードで利用可能な機材から選択",
             )
-            aircraft = available_aircraft[
-                available_aircraft["Model"] == selected_model
-            ].iloc[0]
+            aircraft = aircraft_df.iloc[aircraft_index["model_to_idx"][selected_model]]
 
         with col2:
             if constraint_type == "budget":
@@ -607,21 +929,22 @@ elif game_mode == "budget_constraint":
             departure = st.selectbox(
                 "出発地",
                 airports_df.index,
-                format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+                format_func=airport_index["label"].get,
             )
         with col2:
-            arrival_options = [code for code in airports_df.index if code != departure]
+            arrival_options = airports_df.index.drop(departure)
             arrival = st.selectbox(
                 "到着地",
                 arrival_options,
-                format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+                format_func=airport_index["label"].get,
             )
         with col3:
+            capacity = int(aircraft["Capacity"])
             passengers = st.number_input(
                 "搭乗予定人数",
                 1,
-                int(aircraft["Capacity"]),
-                min(200, int(aircraft["Capacity"])),
+                capacity,
+                min(200, capacity),
             )
 
 else:
@@ -636,11 +959,9 @@ else:
     )
 
     if category_filter == "All":
-        available_aircraft = aircraft_df.copy()
+        available_aircraft = aircraft_df
     else:
-        available_aircraft = aircraft_df[
-            aircraft_df["Category"] == category_filter
-        ].copy()
+        available_aircraft = aircraft_df[aircraft_index["category"] == category_filter]
 
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -649,9 +970,7 @@ else:
             available_aircraft["Model"],
             help="カテゴリフィルターで絞り込まれた機材から選択してください",
         )
-        aircraft = available_aircraft[
-            available_aircraft["Model"] == selected_model
-        ].iloc[0]
+        aircraft = aircraft_df.iloc[aircraft_index["model_to_idx"][selected_model]]
 
     with col2:
         st.metric("ETOPS性能", f"{aircraft['ETOPS']}分")
@@ -679,22 +998,23 @@ else:
         departure = st.selectbox(
             "出発地",
             airports_df.index,
-            format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+            format_func=airport_index["label"].get,
         )
     with col2:
-        arrival_options = [code for code in airports_df.index if code != departure]
+        arrival_options = airports_df.index.drop(departure)
         arrival = st.selectbox(
             "到着地",
             arrival_options,
-            format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+            format_func=airport_index["label"].get,
         )
     with col3:
+        capacity = int(aircraft["Capacity"])
         passengers = st.number_input(
             "搭乗予定人数",
             1,
-            int(aircraft["Capacity"]),
-            min(200, int(aircraft["Capacity"])),
-            help=f"最大搭乗可能人数: {aircraft['Capacity']}人",
+            capacity,
+            min(200, capacity),
+            help=f"最大搭乗可能人数: {capacity}人",
         )
 
 # --- Route Analysis (Common for all modes) ---
@@ -702,44 +1022,29 @@ if departure and arrival and departure != arrival and aircraft is not None:
     st.header("ルート分析 & ゲーム結果")
 
     # Get coordinates
-    dep_coord = (
-        airports_df.loc[departure, "Latitude"],
-        airports_df.loc[departure, "Longitude"],
-    )
-    arr_coord = (
-        airports_df.loc[arrival, "Latitude"],
-        airports_df.loc[arrival, "Longitude"],
-    )
-
-    # Calculate route metrics
-    route_distance = geodesic(dep_coord, arr_coord).km
-    etops_required_km = calculate_etops_requirement(dep_coord, arr_coord, airports_df)
-    etops_required_min = (etops_required_km / aircraft["Speed"]) * 60
+    dep_coord = get_airport_coord(departure)
+    arr_coord = get_airport_coord(arrival)
 
-    # SDG Impact Analysis
-    sdg_metrics = calculate_sdg_impact(aircraft, route_distance, passengers)
-
-    # Calculate Game Score
-    etops_compliant = etops_required_min <= aircraft["ETOPS"]
-    capacity_utilization = (passengers / aircraft["Capacity"]) * 100
+    # Route metrics, SDG impact and game score (cached per model/route/load)
+    (
+        route_distance,
+        etops_required_min,
+        etops_compliant,
+        capacity_utilization,
+        sdg_metrics,
+        score_data,
+        title_data,
+    ) = analyze_route(selected_model, departure, arrival, passengers)
 
     if game_mode == "challenge_10_routes":
         score_data = calculate_route_score_detailed(
             etops_compliant,
-            sdg_metrics["co2_per_passenger"],
+            sdg_metrics.co2_per_passenger,
             capacity_utilization,
             aircraft["SDG_Score"],
             route_distance,
         )
-    else:
-        score_data = calculate_game_score(
-            etops_compliant,
-            sdg_metrics["co2_per_passenger"],
-            capacity_utilization,
-            aircraft["SDG_Score"],
-        )
-
-    title_data = get_title_and_badge(score_data["total_score"])
+        title_data = get_title_and_badge(score_data["total_score"])
 
     # Display scoring dashboard in sidebar (for non-challenge modes)
     if game_mode != "challenge_10_routes":
@@ -756,7 +1061,7 @@ if departure and arrival and departure != arrival and aircraft is not None:
         with col1:
             st.metric("ETOPS適合", "✅" if etops_compliant else "❌")
         with col2:
-            st.metric("CO₂/人", f"{sdg_metrics['co2_per_passenger']:.1f} kg")
+            st.metric("CO₂/人", f"{sdg_metrics.co2_per_passenger:.1f} kg")
         with col3:
             st.metric("搭乗率", f"{capacity_utilization:.1f}%")
         with col4:
@@ -800,15 +1105,15 @@ if departure and arrival and departure != arrival and aircraft is not None:
 
     if st.session_state.map_type == "folium":
         try:
-            etops_map = create_etops_map(
-                dep_coord,
-                arr_coord,
-                f"{departure} ({airports_df.loc[departure, 'Name']})",
-                f"{arrival} ({airports_df.loc[arrival, 'Name']})",
-                aircraft["ETOPS"],
-                etops_required_min,
+            # Required minutes are rounded so the cached HTML is reused across reruns
+            etops_map_html = build_etops_map_html(
+                departure,
+                arrival,
+                int(aircraft["ETOPS"]),
+                round(etops_required_min),
+                etops_compliant,
             )
-            map_data = st_folium(etops_map, width=700, height=500)
+            components.html(etops_map_html, width=700, height=500)
             st.info(
                 "🗺️ **地図の見方**: オレンジの円はETOPS範囲を示しています。青い線が飛行ルートで、全区間がETOPS範囲内にある必要があります。"
             )
@@ -817,32 +1122,30 @@ if departure and arrival and departure != arrival and aircraft is not None:
             route_map = create_route_map_plotly(
                 dep_coord,
                 arr_coord,
-                f"{departure} ({airports_df.loc[departure, 'Name']})",
-                f"{arrival} ({airports_df.loc[arrival, 'Name']})",
+                f"{departure} ({get_airport_name(departure)})",
+                f"{arrival} ({get_airport_name(arrival)})",
             )
-            st.plotly_chart(route_map, use_container_width=True)
+            st.plotly_chart(route_map, use_container_width=True, key="route_map_mode")
     else:
         route_map = create_route_map_plotly(
             dep_coord,
             arr_coord,
-            f"{departure} ({airports_df.loc[departure, 'Name']})",
-            f"{arrival} ({airports_df.loc[arrival, 'Name']})",
+            f"{departure} ({get_airport_name(departure)})",
+            f"{arrival} ({get_airport_name(arrival)})",
         )
-        st.plotly_chart(route_map, use_container_width=True)
+        st.plotly_chart(route_map, use_container_width=True, key="route_map_mode")
 
     # Route metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("飛行距離", f"{route_distance:,.0f} km")
     with col2:
-        etops_status = (
-            "✅ 適合" if etops_required_min <= aircraft["ETOPS"] else "❌ 不適合"
-        )
+        etops_status = "✅ 適合" if etops_compliant else "❌ 不適合"
         st.metric("ETOPS要求", f"{etops_required_min:.0f}分", delta=etops_status)
     with col3:
-        st.metric("総CO₂排出量", f"{sdg_metrics['total_co2']:,.0f} kg")
+        st.metric("総CO₂排出量", f"{sdg_metrics.total_co2:,.0f} kg")
     with col4:
-        st.metric("乗客1人当たりCO₂", f"{sdg_metrics['co2_per_passenger']:.1f} kg")
+        st.metric("乗客1人当たりCO₂", f"{sdg_metrics.co2_per_passenger:.1f} kg")
 
     # Score breakdown for enhanced modes
     if game_mode == "challenge_10_routes" and "distance_bonus" in score_data:
@@ -886,7 +1189,6 @@ st.markdown(
 st.markdown("**🎯 ゲーム目標**: 80点以上で航空会社経営成功！")
 st.markdown("**✈️ 新機能**: 21機種の航空機 | 10路線チャレンジ | 予算・機材制限モード")
 st.markdown("**ETOPS**: Extended-range Twin-engine Operational Performance Standards")
-st.session_state.map_type = map_type
 
 # --- Aircraft Selection ---
 st.header("1. 機材選択")
@@ -897,10 +1199,10 @@ with col1:
         "使用する機材を選択してください",
         aircraft_df["Model"],
         help="各機材のETOPS性能、燃費、環境性能を考慮して選択してください",
+        key="selected_model",
     )
 
-    aircraft = aircraft_df[aircraft_df["Model"] == selected_model].iloc[0]
-    st.session_state.selected_aircraft = aircraft
+    aircraft = aircraft_df.iloc[aircraft_index["model_to_idx"][selected_model]]
 
 with col2:
     st.metric("ETOPS性能", f"{aircraft['ETOPS']}分")
@@ -928,63 +1230,48 @@ with col1:
     departure = st.selectbox(
         "出発地",
         airports_df.index,
-        format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+        format_func=airport_index["label"].get,
+        key="departure",
     )
-    st.session_state.departure = departure
 
 with col2:
-    arrival_options = [code for code in airports_df.index if code != departure]
+    arrival_options = airports_df.index.drop(departure)
     arrival = st.selectbox(
         "到着地",
         arrival_options,
-        format_func=lambda x: f"{x} - {airports_df.loc[x, 'Name']}",
+        format_func=airport_index["label"].get,
+        key="arrival",
     )
-    st.session_state.arrival = arrival
 
 with col3:
+    capacity = int(aircraft["Capacity"])
     passengers = st.number_input(
         "搭乗予定人数",
         min_value=1,
-        max_value=int(aircraft["Capacity"]),
-        value=min(200, int(aircraft["Capacity"])),
-        help=f"最大搭乗可能人数: {aircraft['Capacity']}人",
+        max_value=capacity,
+        value=min(200, capacity),
+        help=f"最大搭乗可能人数: {capacity}人",
+        key="passengers",
     )
-    st.session_state.passengers = passengers
 
 # --- Route Analysis ---
 if departure and arrival and departure != arrival:
     st.header("3. ルート分析 & ゲーム結果")
 
     # Get coordinates
-    dep_coord = (
-        airports_df.loc[departure, "Latitude"],
-        airports_df.loc[departure, "Longitude"],
-    )
-    arr_coord = (
-        airports_df.loc[arrival, "Latitude"],
-        airports_df.loc[arrival, "Longitude"],
-    )
+    dep_coord = get_airport_coord(departure)
+    arr_coord = get_airport_coord(arrival)
 
-    # Calculate route metrics
-    route_distance = geodesic(dep_coord, arr_coord).km
-    etops_required_km = calculate_etops_requirement(dep_coord, arr_coord, airports_df)
-    etops_required_min = (etops_required_km / aircraft["Speed"]) * 60
-
-    # SDG Impact Analysis
-    sdg_metrics = calculate_sdg_impact(aircraft, route_distance, passengers)
-
-    # Calculate Game Score
-    etops_compliant = etops_required_min <= aircraft["ETOPS"]
-    capacity_utilization = (passengers / aircraft["Capacity"]) * 100
-
-    score_data = calculate_game_score(
+    # Route metrics, SDG impact and game score (cached per model/route/load)
+    (
+        route_distance,
+        etops_required_min,
         etops_compliant,
-        sdg_metrics["co2_per_passenger"],
         capacity_utilization,
-        aircraft["SDG_Score"],
-    )
-
-    title_data = get_title_and_badge(score_data["total_score"])
+        sdg_metrics,
+        score_data,
+        title_data,
+    ) = analyze_route(selected_model, departure, arrival, passengers)
 
     # Display scoring dashboard in sidebar
     display_score_dashboard(score_data, title_data)
@@ -998,17 +1285,17 @@ if departure and arrival and departure != arrival:
     if st.session_state.map_type == "folium":
         try:
             # Create enhanced folium map with ETOPS visualization
-            etops_map = create_etops_map(
-                dep_coord,
-                arr_coord,
-                f"{departure} ({airports_df.loc[departure, 'Name']})",
-                f"{arrival} ({airports_df.loc[arrival, 'Name']})",
-                aircraft["ETOPS"],
-                etops_required_min,
+            # Required minutes are rounded so the cached HTML is reused across reruns
+            etops_map_html = build_etops_map_html(
+                departure,
+                arrival,
+                int(aircraft["ETOPS"]),
+                round(etops_required_min),
+                etops_compliant,
             )
 
             # Display the map
-            map_data = st_folium(etops_map, width=700, height=500)
+            components.html(etops_map_html, width=700, height=500)
 
             st.info(
                 "🗺️ **地図の見方**: オレンジの円はETOPS範囲を示しています。青い線が飛行ルートで、全区間がETOPS範囲内にある必要があります。"
@@ -1022,19 +1309,19 @@ if departure and arrival and departure != arrival:
             route_map = create_route_map_plotly(
                 dep_coord,
                 arr_coord,
-                f"{departure} ({airports_df.loc[departure, 'Name']})",
-                f"{arrival} ({airports_df.loc[arrival, 'Name']})",
+                f"{departure} ({get_airport_name(departure)})",
+                f"{arrival} ({get_airport_name(arrival)})",
             )
-            st.plotly_chart(route_map, use_container_width=True)
+            st.plotly_chart(route_map, use_container_width=True, key="route_map_main")
     else:
         # Use plotly map
         route_map = create_route_map_plotly(
             dep_coord,
             arr_coord,
-            f"{departure} ({airports_df.loc[departure, 'Name']})",
-            f"{arrival} ({airports_df.loc[arrival, 'Name']})",
+            f"{departure} ({get_airport_name(departure)})",
+            f"{arrival} ({get_airport_name(arrival)})",
         )
-        st.plotly_chart(route_map, use_container_width=True)
+        st.plotly_chart(route_map, use_container_width=True, key="route_map_main")
 
     # Route metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -1043,23 +1330,21 @@ if departure and arrival and departure != arrival:
         st.metric("飛行距離", f"{route_distance:,.0f} km")
 
     with col2:
-        etops_status = (
-            "✅ 適合" if etops_required_min <= aircraft["ETOPS"] else "❌ 不適合"
-        )
+        etops_status = "✅ 適合" if etops_compliant else "❌ 不適合"
         st.metric("ETOPS要求", f"{etops_required_min:.0f}分", delta=etops_status)
 
     with col3:
-        st.metric("総CO₂排出量", f"{sdg_metrics['total_co2']:,.0f} kg")
+        st.metric("総CO₂排出量", f"{sdg_metrics.total_co2:,.0f} kg")
 
     with col4:
-        st.metric("乗客1人当たりCO₂", f"{sdg_metrics['co2_per_passenger']:.1f} kg")
+        st.metric("乗客1人当たりCO₂", f"{sdg_metrics.co2_per_passenger:.1f} kg")
 
     # Detailed Analysis
     st.subheader("詳細分析")
 
     # ETOPS Analysis
     st.write("**ETOPS分析**")
-    if etops_required_min <= aircraft["ETOPS"]:
+    if etops_compliant:
         st.success(
             f"✅ この機材（ETOPS {aircraft['ETOPS']}分）でこのルートを安全に飛行できます"
         )
@@ -1076,13 +1361,13 @@ if departure and arrival and departure != arrival:
 
     with col1:
         st.write("**環境負荷指標**")
-        st.metric("燃料消費量", f"{sdg_metrics['total_fuel']:,.0f} L")
-        st.metric("CO₂効率スコア", f"{sdg_metrics['efficiency_score']:.1f}/10")
+        st.metric("燃料消費量", f"{sdg_metrics.total_fuel:,.0f} L")
+        st.metric("CO₂効率スコア", f"{sdg_metrics.efficiency_score:.1f}/10")
 
         # CO2 comparison with other transport
         car_co2 = route_distance * 0.12 * passengers
         st.write(f"🚗 同距離を自動車で移動した場合のCO₂: {car_co2:,.0f} kg")
-        co2_reduction = ((car_co2 - sdg_metrics["total_co2"]) / car_co2) * 100
+        co2_reduction = ((car_co2 - sdg_metrics.total_co2) / car_co2) * 100
         if co2_reduction > 0:
             st.success(f"✅ 自動車比 {co2_reduction:.1f}% CO₂削減")
         else:
@@ -1090,10 +1375,9 @@ if departure and arrival and departure != arrival:
 
     with col2:
         st.write("**運航効率指標**")
-        capacity_utilization = (passengers / aircraft["Capacity"]) * 100
         st.metric("座席利用率", f"{capacity_utilization:.1f}%")
-        st.metric("利用効率スコア", f"{sdg_metrics['utilization_score']:.1f}/10")
-        st.metric("総合SDGスコア", f"{sdg_metrics['total_sdg_score']:.1f}/10")
+        st.metric("利用効率スコア", f"{sdg_metrics.utilization_score:.1f}/10")
+        st.metric("総合SDGスコア", f"{sdg_metrics.total_sdg_score:.1f}/10")
 
     # Recommendations for improvement
     st.subheader("💡 スコアアップのコツ")
@@ -1104,7 +1388,7 @@ if departure and arrival and departure != arrival:
             "🎯 **ETOPS適合で+25点**: より高性能な機材(A350-900等)を選択しましょう"
         )
 
-    if sdg_metrics["co2_per_passenger"] > 150:
+    if sdg_metrics.co2_per_passenger > 150:
         improvements.append(
             "🌱 **環境スコアアップ**: 燃費の良い機材選択で環境スコア向上"
         )